@@ -1,16 +1,129 @@
+import argparse
 import datetime
+import hashlib
 import os
+import pprint
 import shutil
 import subprocess
 import sys
 
 
+APP_NAME = "esp32_mac_monitor"
+
+SPEC_TEMPLATE = """# -*- mode: python ; coding: utf-8 -*-
+{header}
+# Generated by build.py; delete it (or use ESP_BUILD_REGEN_SPEC=1) to regenerate.
+import os
+
+a = Analysis(
+    [os.path.join(SPECPATH, "main.py")],
+    pathex=[],
+    binaries={binaries},
+    datas=[(os.path.join(SPECPATH, "VERSION"), ".")] + {datas},
+    hiddenimports={hiddenimports},
+    hookspath=[],
+    hooksconfig={{}},
+    runtime_hooks=[],
+    excludes={excludes},
+    noarchive=False,
+)
+pyz = PYZ(a.pure)
+{bundle}"""
+
+ONEFILE_BUNDLE = """exe = EXE(
+    pyz,
+    a.scripts,
+    a.binaries,
+    a.datas,
+    [],
+    name="esp32_mac_monitor",
+    debug=False,
+    strip=True,
+    upx=False,
+    console=False,
+)
+"""
+
+ONEDIR_BUNDLE = """exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name="esp32_mac_monitor",
+    debug=False,
+    strip=True,
+    upx=False,
+    console=False,
+)
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=True,
+    upx=False,
+    name="esp32_mac_monitor",
+)
+"""
+
+SPEC_PACKAGES = ("pyinstaller", "wxPython", "pyserial", "openpyxl", "esptool")
+
+
 def run(cmd: list[str]) -> None:
     completed = subprocess.run(cmd)
     if completed.returncode != 0:
         raise SystemExit(completed.returncode)
 
 
+def _native_rmtree_cmd(path: str) -> list[str] | None:
+    if sys.platform.startswith("win"):
+        if shutil.which("cmd") is None:
+            return None
+        return ["cmd", "/c", "rd", "/s", "/q", path]
+    if shutil.which("rm") is None:
+        return None
+    return ["rm", "-rf", path]
+
+
+def _fast_rmtree(path: str) -> None:
+    cmd = _native_rmtree_cmd(path)
+    if cmd is not None:
+        try:
+            subprocess.run(cmd, check=True)
+            return
+        except (OSError, subprocess.CalledProcessError):
+            pass
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def remove_in_background(path: str) -> None:
+    tmp = f"{path}.del.{os.getpid()}"
+    try:
+        os.rename(path, tmp)
+    except OSError:
+        _fast_rmtree(path)
+        return
+    cmd = _native_rmtree_cmd(tmp)
+    if cmd is None:
+        shutil.rmtree(tmp, ignore_errors=True)
+        return
+    if sys.platform.startswith("win"):
+        options = {
+            "creationflags": subprocess.DETACHED_PROCESS
+            | subprocess.CREATE_NEW_PROCESS_GROUP
+        }
+    else:
+        options = {"start_new_session": True}
+    try:
+        subprocess.Popen(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            **options,
+        )
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
 def read_version(project_root: str) -> str:
     path = os.path.join(project_root, "VERSION")
     try:
@@ -20,25 +133,117 @@ def read_version(project_root: str) -> str:
     except OSError:
         return "0.0.0"
 
-def add_data_arg(source: str, target: str) -> str:
-    separator = ";" if sys.platform.startswith("win") else ":"
-    return f"{source}{separator}{target}"
+def get_cache_dir() -> str:
+    if sys.platform.startswith("win"):
+        root = os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
+        return os.path.join(root, "esp_read_mac", "cache")
+    root = os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache"))
+    return os.path.join(root, "esp_read_mac")
+
+
+def spec_name(onefile: bool) -> str:
+    return f"{APP_NAME}-onefile.spec" if onefile else f"{APP_NAME}.spec"
+
+
+def build_cache_key(project_root: str, spec_path: str, cmd: list[str]) -> str:
+    digest = hashlib.sha256()
+    for path in ("main.py", "VERSION", spec_path):
+        with open(os.path.join(project_root, path), "rb") as handle:
+            digest.update(handle.read())
+    digest.update(repr(cmd).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def spec_header(excludes: list[str], onefile: bool) -> str:
+    from importlib import metadata
+
+    versions = []
+    for name in SPEC_PACKAGES:
+        try:
+            versions.append((name, metadata.version(name)))
+        except metadata.PackageNotFoundError:
+            versions.append((name, ""))
+    digest = hashlib.sha256(
+        repr((sys.version, versions, excludes, onefile, SPEC_TEMPLATE)).encode(
+            "utf-8"
+        )
+    )
+    return f"# spec key: {digest.hexdigest()[:16]}"
+
+
+def read_spec_header(path: str) -> str:
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            handle.readline()
+            return handle.readline().strip()
+    except OSError:
+        return ""
+
+
+def write_spec(path: str, header: str, excludes: list[str], onefile: bool) -> None:
+    from PyInstaller.utils.hooks import (
+        collect_data_files,
+        collect_dynamic_libs,
+        collect_submodules,
+    )
+
+    def keep(name: str) -> bool:
+        return not any(
+            name == module or name.startswith(f"{module}.") for module in excludes
+        )
+
+    hiddenimports = ["serial.tools.list_ports"]
+    for package in ("openpyxl", "esptool"):
+        hiddenimports.extend(collect_submodules(package, filter=keep))
+    datas = []
+    for package in ("wx", "openpyxl", "esptool"):
+        datas.extend(collect_data_files(package))
+    binaries = collect_dynamic_libs("wx")
+
+    text = SPEC_TEMPLATE.format(
+        header=header,
+        binaries=pprint.pformat(binaries),
+        datas=pprint.pformat(datas),
+        hiddenimports=pprint.pformat(sorted(set(hiddenimports))),
+        excludes=pprint.pformat(excludes),
+        bundle=ONEFILE_BUNDLE if onefile else ONEDIR_BUNDLE,
+    )
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(text)
+
+
+def ensure_spec(project_root: str, excludes: list[str], onefile: bool) -> str:
+    name = spec_name(onefile)
+    path = os.path.join(project_root, name)
+    header = spec_header(excludes, onefile)
+    if os.environ.get("ESP_BUILD_REGEN_SPEC") or read_spec_header(path) != header:
+        print(f"generating {name}")
+        write_spec(path, header, excludes, onefile)
+    return path
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build esp32_mac_monitor.")
+    parser.add_argument(
+        "--onefile",
+        action="store_true",
+        help="build a single self-extracting executable instead of a zipped folder",
+    )
+    return parser.parse_args()
 
 
 def main() -> None:
+    args = parse_args()
     project_root = os.path.dirname(os.path.abspath(__file__))
     version = read_version(project_root)
     build_root = os.path.join(project_root, "build", version)
     dist_dir = os.path.join(build_root, "dist")
     work_dir = os.path.join(build_root, "work")
-    spec_dir = os.path.join(build_root, "spec")
     bin_dir = os.path.join(project_root, "bin")
 
-    if os.path.isdir(build_root):
-        shutil.rmtree(build_root)
-    os.makedirs(bin_dir, exist_ok=True)
-
     exclude_modules = [
+        "openpyxl.tests",
+        "esptool.tests",
         # wxPython optional modules and extras
         "wx.py",
         "wx.svg",
@@ -49,61 +254,68 @@ def main() -> None:
         "wx.lib.gizmos",
         "wx.lib.plot",
         "wx.lib.floatcanvas",
+        # stdlib and third-party modules the app never imports
+        "tkinter",
+        "pydoc",
+        "xmlrpc",
+        "http.server",
+        "test",
+        "distutils",
+        "setuptools",
+        "pip",
+        "numpy.testing",
+        "scipy",
+        "IPython",
+        "jupyter",
+        "sphinx",
     ]
+    spec_path = ensure_spec(project_root, exclude_modules, args.onefile)
 
     cmd = [
         sys.executable,
         "-m",
         "PyInstaller",
-        "--clean",
         "--noconfirm",
-        "--name",
-        "esp32_mac_monitor",
-        "--windowed",
-        "--onefile",
-        "--strip",
         "--distpath",
         dist_dir,
         "--workpath",
         work_dir,
-        "--specpath",
-        spec_dir,
-        "--hidden-import",
-        "serial.tools.list_ports",
-        "--collect-submodules",
-        "openpyxl",
-        "--collect-submodules",
-        "esptool",
-        "--collect-data",
-        "wx",
-        "--collect-binaries",
-        "wx",
-        "--collect-data",
-        "openpyxl",
-        "--collect-data",
-        "esptool",
-        "--exclude-module",
-        "openpyxl.tests",
-        "--exclude-module",
-        "esptool.tests",
-        "--add-data",
-        add_data_arg(os.path.join(project_root, "VERSION"), "."),
-        os.path.join(project_root, "main.py"),
+        spec_path,
     ]
-    for module in exclude_modules:
-        cmd.extend(["--exclude-module", module])
-
-    run(cmd)
 
-    suffix = ".exe" if sys.platform.startswith("win") else ""
+    if args.onefile:
+        suffix = ".exe" if sys.platform.startswith("win") else ""
+        src = os.path.join(dist_dir, f"{APP_NAME}{suffix}")
+    else:
+        suffix = ".zip"
+        src = os.path.join(dist_dir, f"{APP_NAME}.zip")
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    src = os.path.join(dist_dir, f"esp32_mac_monitor{suffix}")
-    dst = os.path.join(
-        bin_dir, f"esp32_mac_monitor_v{version}_{timestamp}{suffix}"
+    dst = os.path.join(bin_dir, f"{APP_NAME}_v{version}_{timestamp}{suffix}")
+
+    use_cache = not os.environ.get("ESP_BUILD_NO_CACHE")
+    cache_key = build_cache_key(project_root, spec_path, cmd)
+    cache_path = os.path.join(
+        get_cache_dir(), f"dist-{cache_key}", f"{APP_NAME}{suffix}"
     )
-    if os.path.isfile(dst):
-        os.remove(dst)
+    os.makedirs(bin_dir, exist_ok=True)
+    if use_cache and os.path.isfile(cache_path):
+        shutil.copy2(cache_path, dst)
+        print(f"cache hit: {cache_key}")
+        return
+
+    if os.path.isdir(build_root):
+        remove_in_background(build_root)
+
+    run(cmd)
+
+    if not args.onefile:
+        shutil.make_archive(
+            os.path.join(dist_dir, APP_NAME), "zip", dist_dir, APP_NAME
+        )
     shutil.copy2(src, dst)
+    if use_cache:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        shutil.copy2(src, cache_path)
 
 
 if __name__ == "__main__":
@@ -1,12 +1,31 @@
+import argparse
 import datetime
+import functools
+import importlib
 import os
+import re
+import select
 import sys
+import threading
+import time
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Callable
 
 import wx
 from serial.tools import list_ports
 
+_HEX12 = re.compile(r"[0-9a-f]{12}").fullmatch
+_esptool = None
+_MAC_CACHE: dict[tuple[str, str], tuple[float, str, str]] = {}
+_mac_cache_lock = threading.Lock()
+_mac_cache_enabled = True
+
+MAX_ROWS = 50000
+MAC_CACHE_TTL = 30.0
+EXPORT_PROGRESS_STEP = 500
+
 
 def ensure_gtk_resources() -> None:
     if not sys.platform.startswith("linux"):
@@ -25,6 +44,7 @@ def ensure_gtk_resources() -> None:
             os.environ["XDG_DATA_DIRS"] = share_dir
 
 
+@functools.lru_cache(maxsize=1)
 def get_config_path() -> Path:
     if sys.platform.startswith("win"):
         root = os.environ.get("APPDATA", str(Path.home()))
@@ -55,23 +75,33 @@ def load_config() -> dict:
         return {}
 
 
-def save_config(data: dict) -> None:
+CONFIG_ENCODERS: dict[type, Callable[[Any], str]] = {
+    bool: lambda value: "true" if value else "false",
+    int: str,
+    str: lambda value: '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"',
+}
+
+
+def format_config(data: dict) -> str:
+    return "".join(
+        f"{key} = {CONFIG_ENCODERS[type(value)](value)}\n"
+        for key, value in data.items()
+        if type(value) in CONFIG_ENCODERS
+    )
+
+
+def write_config(text: str) -> None:
     path = get_config_path()
     path.parent.mkdir(parents=True, exist_ok=True)
-    lines = []
-    for key, value in data.items():
-        if isinstance(value, bool):
-            lines.append(f"{key} = {'true' if value else 'false'}")
-        elif isinstance(value, int):
-            lines.append(f"{key} = {value}")
-        elif isinstance(value, str):
-            escaped = value.replace("\\", "\\\\").replace('"', '\\"')
-            lines.append(f'{key} = "{escaped}"')
-    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    path.write_bytes(text.encode("utf-8"))
 
 
+@functools.lru_cache(maxsize=1)
 def default_max_workers() -> int:
-    count = os.cpu_count() or 4
+    if hasattr(os, "sched_getaffinity"):
+        count = len(os.sched_getaffinity(0))
+    else:
+        count = os.cpu_count() or 4
     count = max(2, count)
     gil_enabled = getattr(sys, "_is_gil_enabled", None)
     if callable(gil_enabled) and not gil_enabled():
@@ -79,63 +109,111 @@ def default_max_workers() -> int:
     return min(8, count)
 
 
+BORDER_ON_RGB = (30, 136, 229)
+BORDER_OFF_RGB = (156, 163, 175)
+FILL_WHITE_RGB = (255, 255, 255)
+ARROW_RGB = (107, 114, 128)
+
+_BITMAP_CACHE: dict[tuple, wx.Bitmap] = {}
+
+
+def _window_rgb() -> tuple[int, int, int]:
+    colour = wx.SystemSettings.GetColour(wx.SYS_COLOUR_WINDOW)
+    return colour.Red(), colour.Green(), colour.Blue()
+
+
+def _put_pixel(
+    pixels: bytearray, size: int, x: int, y: int, rgb: tuple[int, int, int]
+) -> None:
+    if 0 <= x < size and 0 <= y < size:
+        offset = (y * size + x) * 3
+        pixels[offset : offset + 3] = bytes(rgb)
+
+
+def _draw_line(
+    pixels: bytearray,
+    size: int,
+    start: tuple[int, int],
+    end: tuple[int, int],
+    rgb: tuple[int, int, int],
+) -> None:
+    (x0, y0), (x1, y1) = start, end
+    steps = max(abs(x1 - x0), abs(y1 - y0), 1)
+    for step in range(steps + 1):
+        x = x0 + round((x1 - x0) * step / steps)
+        y = y0 + round((y1 - y0) * step / steps)
+        # 2 px pen
+        _put_pixel(pixels, size, x, y, rgb)
+        _put_pixel(pixels, size, x + 1, y, rgb)
+
+
+def _pixels_to_bitmap(size: int, pixels: bytearray) -> wx.Bitmap:
+    image = wx.Image(size, size)
+    image.SetData(bytes(pixels))
+    return wx.Bitmap(image)
+
+
 def make_check_bitmap(size: int, checked: bool) -> wx.Bitmap:
-    bmp = wx.Bitmap(size, size)
-    dc = wx.MemoryDC(bmp)
-    bg = wx.SystemSettings.GetColour(wx.SYS_COLOUR_WINDOW)
-    dc.SetBackground(wx.Brush(bg))
-    dc.Clear()
-
-    border = wx.Colour(30, 136, 229) if checked else wx.Colour(156, 163, 175)
-    fill = wx.Colour(30, 136, 229) if checked else bg
-    dc.SetPen(wx.Pen(border, 1))
-    dc.SetBrush(wx.Brush(fill))
-    dc.DrawRoundedRectangle(1, 1, size - 2, size - 2, 2)
+    bg = _window_rgb()
+    key = ("check", size, checked, bg)
+    cached = _BITMAP_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    pixels = bytearray(bytes(bg) * (size * size))
+    border = BORDER_ON_RGB if checked else BORDER_OFF_RGB
+    fill = BORDER_ON_RGB if checked else bg
+    low, high = 1, size - 2
+    for y in range(low, high + 1):
+        for x in range(low, high + 1):
+            edge = x in (low, high) or y in (low, high)
+            _put_pixel(pixels, size, x, y, border if edge else fill)
+    # rounded corners
+    for x, y in ((low, low), (high, low), (low, high), (high, high)):
+        _put_pixel(pixels, size, x, y, bg)
 
     if checked:
-        dc.SetPen(wx.Pen(wx.Colour(255, 255, 255), 2))
-        dc.DrawLine(3, size // 2, size // 2, size - 4)
-        dc.DrawLine(size // 2 - 1, size - 4, size - 3, 3)
+        _draw_line(pixels, size, (3, size // 2), (size // 2, size - 4), FILL_WHITE_RGB)
+        _draw_line(pixels, size, (size // 2 - 1, size - 4), (size - 3, 3), FILL_WHITE_RGB)
 
-    dc.SelectObject(wx.NullBitmap)
+    bmp = _pixels_to_bitmap(size, pixels)
+    _BITMAP_CACHE[key] = bmp
     return bmp
 
 
 def make_arrow_bitmap(size: int) -> wx.Bitmap:
-    bmp = wx.Bitmap(size, size)
-    dc = wx.MemoryDC(bmp)
-    bg = wx.SystemSettings.GetColour(wx.SYS_COLOUR_WINDOW)
-    dc.SetBackground(wx.Brush(bg))
-    dc.Clear()
-
-    dc.SetPen(wx.Pen(wx.Colour(107, 114, 128), 1))
-    dc.SetBrush(wx.Brush(wx.Colour(107, 114, 128)))
+    bg = _window_rgb()
+    key = ("arrow", size, bg)
+    cached = _BITMAP_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    pixels = bytearray(bytes(bg) * (size * size))
     center = size // 2
-    points = [
-        (center - 3, center - 1),
-        (center + 3, center - 1),
-        (center, center + 3),
-    ]
-    dc.DrawPolygon(points)
-
-    dc.SelectObject(wx.NullBitmap)
+    # downward triangle with corners (center - 3, center - 1),
+    # (center + 3, center - 1) and (center, center + 3)
+    for y in range(center - 1, center + 4):
+        half = int(3 * (center + 3 - y) / 4 + 0.5)
+        for x in range(center - half, center + half + 1):
+            _put_pixel(pixels, size, x, y, ARROW_RGB)
+
+    bmp = _pixels_to_bitmap(size, pixels)
+    _BITMAP_CACHE[key] = bmp
     return bmp
 
 
 def format_mac(value: object) -> str:
     if isinstance(value, (bytes, bytearray)):
-        raw = value
-        return ":".join(f"{byte:02x}" for byte in raw)
+        return value.hex(":")
     if isinstance(value, (list, tuple)):
         try:
-            raw = bytes(value)
-            return ":".join(f"{byte:02x}" for byte in raw)
+            return bytes(value).hex(":")
         except Exception:
             return str(value).lower()
     if isinstance(value, str):
         text = value.strip().lower()
-        if len(text) == 12 and all(c in "0123456789abcdef" for c in text):
-            return ":".join(text[i : i + 2] for i in range(0, 12, 2))
+        if _HEX12(text):
+            return bytes.fromhex(text).hex(":")
         return text
     return str(value).lower()
 
@@ -150,32 +228,282 @@ def close_esp_port(esp: object) -> None:
         pass
 
 
-def read_mac_via_esptool(port: str) -> tuple[str, str]:
-    try:
-        import esptool
-    except Exception as exc:
-        return "", f"import error: {exc}"
+def connect_esp(esptool: Any, port: str) -> object | None:
+    # detect_chip returns an already connected loader; connecting again
+    # would repeat the reset and sync handshake.
+    if hasattr(esptool, "detect_chip"):
+        esp = esptool.detect_chip(port=port, baud=115200)
+    elif hasattr(esptool, "ESPLoader") and hasattr(esptool.ESPLoader, "detect_chip"):
+        esp = esptool.ESPLoader.detect_chip(port=port, baud=115200)
+    else:
+        return None
+    return esp
+
+
+def read_mac_via_esptool(port: str, serial: str = "") -> tuple[str, str]:
+    # Only trust the cache when the USB serial number identifies the board,
+    # otherwise a different board plugged into the same port would be missed.
+    key = (port, serial)
+    if serial and _mac_cache_enabled:
+        with _mac_cache_lock:
+            cached = _MAC_CACHE.get(key)
+            if cached is not None and time.monotonic() - cached[0] >= MAC_CACHE_TTL:
+                del _MAC_CACHE[key]
+                cached = None
+        if cached is not None:
+            return cached[1], cached[2]
+
+    mac, status = probe_mac(port)
+    if serial and _mac_cache_enabled and status == "ok":
+        now = time.monotonic()
+        with _mac_cache_lock:
+            # keep only what was read within the TTL
+            expired = [
+                stale
+                for stale, (stamp, _, _) in _MAC_CACHE.items()
+                if now - stamp >= MAC_CACHE_TTL
+            ]
+            for stale in expired:
+                del _MAC_CACHE[stale]
+            _MAC_CACHE[key] = (now, mac, status)
+    return mac, status
+
+
+def probe_mac(port: str) -> tuple[str, str]:
+    global _esptool
+    if _esptool is None:
+        try:
+            import esptool as _esptool
+        except Exception as exc:
+            return "", f"import error: {exc}"
+    esptool = _esptool
 
+    esp = None
     try:
-        if hasattr(esptool, "detect_chip"):
-            esp = esptool.detect_chip(port=port, baud=115200)
-        elif hasattr(esptool, "ESPLoader") and hasattr(esptool.ESPLoader, "detect_chip"):
-            esp = esptool.ESPLoader.detect_chip(port=port, baud=115200)
-        else:
+        esp = connect_esp(esptool, port)
+        if esp is None:
             return "", "esptool api not found"
 
-        if hasattr(esp, "connect"):
-            esp.connect()
-
         mac_raw = esp.read_mac()
         mac = format_mac(mac_raw)
-        close_esp_port(esp)
 
         if not mac:
             return "", "mac not found"
         return mac, "ok"
     except Exception as exc:
         return "", f"error: {exc}"
+    finally:
+        if esp is not None:
+            close_esp_port(esp)
+
+
+def _write_xlsx(
+    path: str,
+    rows: list[dict[str, Any]],
+    mac_only: bool,
+    progress: Callable[[int], None] | None = None,
+) -> None:
+    import openpyxl
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("ESP32 MAC")
+    if not mac_only:
+        sheet.append(("时间", "串口", "MAC", "状态"))
+    for done, row in enumerate(rows, 1):
+        if mac_only:
+            mac_value = row.get("mac", "")
+            if mac_value:
+                sheet.append((mac_value,))
+        else:
+            sheet.append((row["time"], row["port"], row["mac"], row["status"]))
+        if progress is not None and done % EXPORT_PROGRESS_STEP == 0:
+            progress(done)
+    workbook.save(path)
+
+
+def scan_ports() -> tuple[tuple[str, str], ...]:
+    return tuple(
+        sorted((port.device, port.serial_number or "") for port in list_ports.comports())
+    )
+
+
+def open_udev_monitor() -> object | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        import pyudev
+    except Exception:
+        return None
+    try:
+        monitor = pyudev.Monitor.from_netlink(pyudev.Context())
+        monitor.filter_by("tty")
+        monitor.start()
+    except Exception:
+        return None
+    return monitor
+
+
+class PortWatcher(threading.Thread):
+    def __init__(
+        self, on_change: Callable[["PortWatcher", frozenset[tuple[str, str]]], None]
+    ) -> None:
+        super().__init__(name="esp32-mac-ports", daemon=True)
+        self.on_change = on_change
+        self.stop_event = threading.Event()
+        self.monitor: object | None = None
+        # self-pipe that lets stop() interrupt a select() on the udev socket
+        self._wake_lock = threading.Lock()
+        self._wake_fds: tuple[int, int] | None = None
+        self.seen_count: dict[tuple[str, str], int] = {}
+        self.stable: set[tuple[str, str]] = set()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        with self._wake_lock:
+            if self._wake_fds is not None:
+                try:
+                    os.write(self._wake_fds[1], b"\0")
+                except OSError:
+                    pass
+
+    def open_monitor(self) -> None:
+        monitor = open_udev_monitor()
+        if monitor is None:
+            return
+        with self._wake_lock:
+            self._wake_fds = os.pipe()
+        self.monitor = monitor
+
+    def close_monitor(self) -> None:
+        # pyudev releases the netlink socket once the Monitor is collected
+        self.monitor = None
+        with self._wake_lock:
+            if self._wake_fds is not None:
+                for fd in self._wake_fds:
+                    os.close(fd)
+                self._wake_fds = None
+
+    def poll_interval(self, idle_iterations: int) -> float:
+        if idle_iterations < 100:
+            return 0.25
+        if self.monitor is not None:
+            # udev wakes us up on hot-plug, polling is only a safety net
+            return 30.0
+        if idle_iterations < 1000:
+            return 1.0
+        return 2.0
+
+    def wait(self, timeout: float) -> None:
+        if self.monitor is None:
+            self.stop_event.wait(timeout)
+            return
+        try:
+            readable, _, _ = select.select(
+                [self.monitor, self._wake_fds[0]], [], [], timeout
+            )
+            if self.monitor in readable:
+                while self.monitor.poll(timeout=0) is not None:
+                    pass
+        except Exception:
+            self.close_monitor()
+            self.stop_event.wait(timeout)
+
+    def update(self, devs: tuple[tuple[str, str], ...]) -> bool:
+        # A port has to be seen on two consecutive scans before it is reported,
+        # and missed on two consecutive scans before it is dropped.
+        current_ports = set(devs)
+        for port in current_ports:
+            self.seen_count[port] = min(self.seen_count.get(port, 0) + 1, 2)
+        for port in self.seen_count.keys() - current_ports:
+            count = self.seen_count[port] - 1
+            if count > 0:
+                self.seen_count[port] = count
+                continue
+            del self.seen_count[port]
+            self.stable.discard(port)
+        for port in current_ports:
+            if self.seen_count[port] == 2:
+                self.stable.add(port)
+        return len(self.seen_count) == len(current_ports) and all(
+            count == 2 for count in self.seen_count.values()
+        )
+
+    def run(self) -> None:
+        self.open_monitor()
+        try:
+            self.watch()
+        finally:
+            self.close_monitor()
+
+    def watch(self) -> None:
+        last_devs: tuple[tuple[str, str], ...] | None = None
+        posted: frozenset[tuple[str, str]] | None = None
+        settled = False
+        idle_iterations = 0
+        while not self.stop_event.is_set():
+            try:
+                devs = scan_ports()
+            except Exception:
+                devs = ()
+
+            if devs != last_devs or not settled:
+                idle_iterations = 0
+                last_devs = devs
+                settled = self.update(devs)
+                if settled and self.stable != posted:
+                    if self.stop_event.is_set():
+                        break
+                    posted = frozenset(self.stable)
+                    wx.CallAfter(self.on_change, self, posted)
+            else:
+                idle_iterations += 1
+            self.wait(self.poll_interval(idle_iterations))
+
+
+class RecordListCtrl(wx.ListCtrl):
+    columns = ("time", "port", "mac", "status")
+
+    def __init__(self, parent: wx.Window) -> None:
+        super().__init__(
+            parent,
+            style=wx.LC_REPORT | wx.LC_VIRTUAL | wx.BORDER_SUNKEN,
+        )
+        self.visible: list[dict[str, Any]] = []
+        # rows before this index were evicted from the front
+        self.start = 0
+
+    def item_count(self) -> int:
+        return len(self.visible) - self.start
+
+    def refresh_all(self) -> None:
+        count = self.item_count()
+        self.SetItemCount(count)
+        if count > 0:
+            self.RefreshItems(0, count - 1)
+
+    def show_rows(self, rows: list[dict[str, Any]]) -> None:
+        self.visible = rows
+        self.start = 0
+        self.refresh_all()
+
+    def append_row(self, row: dict[str, Any]) -> None:
+        self.visible.append(row)
+        count = self.item_count()
+        self.SetItemCount(count)
+        self.RefreshItem(count - 1)
+
+    def drop_oldest(self, row: dict[str, Any]) -> None:
+        if self.item_count() == 0 or self.visible[self.start] is not row:
+            return
+        self.start += 1
+        # compact once the dead prefix outweighs the live rows (amortized O(1))
+        if self.start * 2 > len(self.visible):
+            del self.visible[: self.start]
+            self.start = 0
+        self.refresh_all()
+
+    def OnGetItemText(self, item: int, col: int) -> str:  # noqa: N802
+        return self.visible[self.start + item][self.columns[col]]
 
 
 class MainFrame(wx.Frame):
@@ -185,6 +513,9 @@ class MainFrame(wx.Frame):
         panel = wx.Panel(self)
         self.version = version
         self.config = load_config()
+        self._last_config_hash = hash(format_config(self.config))
+        self._config_call: wx.CallLater | None = None
+        self._export_progress: wx.ProgressDialog | None = None
 
         self.start_button = wx.Button(panel, label="开始")
         self.stop_button = wx.Button(panel, label="停止")
@@ -202,11 +533,10 @@ class MainFrame(wx.Frame):
         self.status_bar.SetStatusWidths([-1, 140])
         self.status_bar.SetStatusText("空闲", 0)
         self.status_bar.SetStatusText(f"v{version}", 1)
+        self._pending_status: str | None = None
+        self._status_call: wx.CallLater | None = None
 
-        self.list_ctrl = wx.ListCtrl(
-            panel,
-            style=wx.LC_REPORT | wx.BORDER_SUNKEN,
-        )
+        self.list_ctrl = RecordListCtrl(panel)
         self.list_ctrl.InsertColumn(0, "时间", width=160)
         self.list_ctrl.InsertColumn(1, "串口", width=120)
         self.list_ctrl.InsertColumn(2, "MAC", width=200)
@@ -257,14 +587,17 @@ class MainFrame(wx.Frame):
 
         self.stop_button.Disable()
 
-        self.timer = wx.Timer(self)
-        self.Bind(wx.EVT_TIMER, self.on_timer, self.timer)
+        self._filter_timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self._deferred_filter, self._filter_timer)
 
         self.executor = None
-        self.scan_inflight = False
-        self.known_ports: set[str] = set()
-        self.pending_ports: set[str] = set()
-        self.rows: list[dict[str, str]] = []
+        self.port_watcher: PortWatcher | None = None
+        # (device, USB serial number) pairs
+        self.known_ports: set[tuple[str, str]] = set()
+        self.pending_ports: set[tuple[str, str]] = set()
+        self.rows: deque[dict[str, Any]] = deque(maxlen=MAX_ROWS)
+        self._ok_rows: deque[dict[str, Any]] = deque()
+        self._fail_rows: deque[dict[str, Any]] = deque()
         self.export_mac_only = bool(self.config.get("export_mac_only", False))
         self.export_mac_only_toggle.SetValue(self.export_mac_only)
         self.update_export_toggle_label()
@@ -281,126 +614,147 @@ class MainFrame(wx.Frame):
         self.clear_button.Bind(wx.EVT_BUTTON, self.clear_table)
         self.remove_failed_button.Bind(wx.EVT_BUTTON, self.remove_failed_rows)
         self.dedup_button.Bind(wx.EVT_BUTTON, self.remove_duplicate_rows)
-        self.search_input.Bind(wx.EVT_TEXT, self.apply_filters)
+        self.search_input.Bind(wx.EVT_TEXT, self.on_search_text)
+        self.Bind(wx.EVT_ACTIVATE, self.on_activate)
         self.Bind(wx.EVT_CLOSE, self.on_close)
 
     def start_monitoring(self, _event: wx.CommandEvent) -> None:
         self.ensure_executor()
-        self.status_bar.SetStatusText("监测中...", 0)
+        self._queue_status("监测中...")
         self.start_button.Disable()
         self.stop_button.Enable()
-        self.timer.Start(1000)
+        self.port_watcher = PortWatcher(self.on_scan_result)
+        self.port_watcher.start()
 
     def stop_monitoring(self, _event: wx.CommandEvent) -> None:
-        self.timer.Stop()
-        self.status_bar.SetStatusText("已停止", 0)
+        self.stop_port_watcher()
+        self._queue_status("已停止")
         self.start_button.Enable()
         self.stop_button.Disable()
 
-    def on_timer(self, _event: wx.TimerEvent) -> None:
-        if self.scan_inflight:
+    def _queue_status(self, text: str) -> None:
+        self._pending_status = text
+        if self._status_call is None:
+            self._status_call = wx.CallLater(16, self._flush_status)
+
+    def _flush_status(self) -> None:
+        self._status_call = None
+        if self._pending_status is not None:
+            self.status_bar.SetStatusText(self._pending_status, 0)
+            self._pending_status = None
+
+    def stop_port_watcher(self) -> None:
+        if self.port_watcher is not None:
+            self.port_watcher.stop()
+            self.port_watcher = None
+
+    def on_scan_result(
+        self, watcher: PortWatcher, current_ports: frozenset[tuple[str, str]]
+    ) -> None:
+        # ignore results a stopped watcher posted before it noticed the stop
+        if watcher is not self.port_watcher:
             return
-        self.scan_inflight = True
-        self.ensure_executor()
-        future = self.executor.submit(self.scan_ports)
-        future.add_done_callback(lambda fut: wx.CallAfter(self.on_scan_result, fut))
-
-    def scan_ports(self) -> set[str]:
-        return {port.device for port in list_ports.comports()}
-
-    def on_scan_result(self, future) -> None:
-        self.scan_inflight = False
-        try:
-            current_ports = future.result()
-        except Exception:
-            current_ports = set()
-
-        removed = self.known_ports - current_ports
-        for port in removed:
-            self.known_ports.discard(port)
-            self.pending_ports.discard(port)
 
         new_ports = current_ports - self.known_ports
-        for port in sorted(new_ports):
-            self.known_ports.add(port)
-            if port in self.pending_ports:
+        self.known_ports = set(current_ports)
+        for key in sorted(new_ports) if len(new_ports) > 1 else new_ports:
+            if key in self.pending_ports:
                 continue
-            self.pending_ports.add(port)
+            self.pending_ports.add(key)
             self.ensure_executor()
-            task = self.executor.submit(read_mac_via_esptool, port)
-            task.add_done_callback(lambda fut, p=port: self.on_mac_result(p, fut))
+            self.executor.submit(self._read_mac, *key)
 
-    def on_mac_result(self, port: str, future) -> None:
+    def _read_mac(self, port: str, serial: str) -> None:
         try:
-            mac, status = future.result()
+            mac, status = read_mac_via_esptool(port, serial)
         except Exception as exc:
             mac, status = "", f"error: {exc}"
+        wx.CallAfter(self._apply_mac, port, serial, mac, status)
+
+    def _apply_mac(self, port: str, serial: str, mac: str, status: str) -> None:
+        self.pending_ports.discard((port, serial))
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        row_data = {
+            "time": timestamp,
+            "port": port,
+            "mac": mac,
+            "status": status,
+            "_search": f"{timestamp} {port} {mac} {status}".lower(),
+            "_is_ok": status == "ok",
+        }
+        self._add_row(row_data)
+        if self._row_matches(row_data, *self.current_filter()):
+            self.list_ctrl.append_row(row_data)
+        count = self.list_ctrl.item_count()
+        if count > 0:
+            self.list_ctrl.EnsureVisible(count - 1)
+
+    def current_filter(self) -> tuple[str, bool | None]:
+        target_ok = {"成功": True, "失败": False}.get(self.status_filter_value)
+        return self.search_input.GetValue().strip().lower(), target_ok
+
+    def _row_matches(self, row: dict[str, Any], query: str, target_ok: bool | None) -> bool:
+        if query and query not in row["_search"]:
+            return False
+        return target_ok is None or row["_is_ok"] == target_ok
 
-        def update_ui() -> None:
-            self.pending_ports.discard(port)
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            row_data = {
-                "time": timestamp,
-                "port": port,
-                "mac": mac,
-                "status": status,
-            }
-            self.rows.append(row_data)
-            self.apply_filters()
-            count = self.list_ctrl.GetItemCount()
-            if count > 0:
-                self.list_ctrl.EnsureVisible(count - 1)
+    def apply_filters(self, _event: wx.CommandEvent | None = None) -> None:
+        query, target_ok = self.current_filter()
 
-        wx.CallAfter(update_ui)
+        if target_ok is None:
+            source = self.rows
+        else:
+            source = self._ok_rows if target_ok else self._fail_rows
+        if query:
+            visible = [row for row in source if query in row["_search"]]
+        else:
+            visible = list(source)
+        self.list_ctrl.show_rows(visible)
 
-    def apply_filters(self, _event: wx.CommandEvent | None = None) -> None:
-        query = self.search_input.GetValue().strip().lower()
-        status_choice = self.status_filter_value
-        self.config["status_filter"] = status_choice
-        save_config(self.config)
-
-        self.list_ctrl.Freeze()
-        self.list_ctrl.DeleteAllItems()
-
-        for row in self.rows:
-            values = [row["time"], row["port"], row["mac"], row["status"]]
-            row_text = " ".join(values).lower()
-            if query and query not in row_text:
-                continue
+    def on_search_text(self, _event: wx.CommandEvent) -> None:
+        self._filter_timer.StartOnce(150)
 
-            if status_choice == "成功" and row["status"] != "ok":
-                continue
-            if status_choice == "失败" and row["status"] == "ok":
-                continue
+    def _deferred_filter(self, _event: wx.TimerEvent) -> None:
+        self.apply_filters()
+
+    def _status_rows(self, row: dict[str, Any]) -> deque[dict[str, Any]]:
+        return self._ok_rows if row["_is_ok"] else self._fail_rows
 
-            index = self.list_ctrl.InsertItem(self.list_ctrl.GetItemCount(), row["time"])
-            self.list_ctrl.SetItem(index, 1, row["port"])
-            self.list_ctrl.SetItem(index, 2, row["mac"])
-            self.list_ctrl.SetItem(index, 3, row["status"])
+    def _add_row(self, row: dict[str, Any]) -> None:
+        if len(self.rows) == self.rows.maxlen:
+            oldest = self.rows[0]
+            self._status_rows(oldest).popleft()
+            self.list_ctrl.drop_oldest(oldest)
+        self.rows.append(row)
+        self._status_rows(row).append(row)
 
-        self.list_ctrl.Thaw()
+    def _set_rows(self, rows: list[dict[str, Any]]) -> None:
+        self.rows = deque(rows, maxlen=MAX_ROWS)
+        self._ok_rows = deque(row for row in self.rows if row["_is_ok"])
+        self._fail_rows = deque(row for row in self.rows if not row["_is_ok"])
 
     def clear_table(self, _event: wx.CommandEvent) -> None:
-        self.rows.clear()
+        if not self.rows:
+            return
+        self._set_rows([])
         self.apply_filters()
 
     def remove_failed_rows(self, _event: wx.CommandEvent) -> None:
-        self.rows = [row for row in self.rows if row["status"] == "ok"]
+        if not self._fail_rows:
+            return
+        self._set_rows(list(self._ok_rows))
         self.apply_filters()
 
     def remove_duplicate_rows(self, _event: wx.CommandEvent) -> None:
-        seen: set[str] = set()
-        deduped: list[dict[str, str]] = []
-        for row in self.rows:
-            mac = row.get("mac", "")
-            if not mac:
-                deduped.append(row)
-                continue
-            if mac in seen:
-                continue
-            seen.add(mac)
-            deduped.append(row)
-        self.rows = deduped
+        first_by_mac: dict[str, dict[str, Any]] = {}
+        deduped = [
+            row
+            for row in self.rows
+            if not row.get("mac") or first_by_mac.setdefault(row["mac"], row) is row
+        ]
+        if len(deduped) == len(self.rows):
+            return
+        self._set_rows(deduped)
         self.apply_filters()
 
     def export_excel(self, _event: wx.CommandEvent) -> None:
@@ -411,7 +765,6 @@ class MainFrame(wx.Frame):
         mac_only = self.export_mac_only_toggle.GetValue()
         self.export_mac_only = mac_only
         self.config["export_mac_only"] = self.export_mac_only
-        save_config(self.config)
 
         dialog = wx.FileDialog(
             self,
@@ -425,28 +778,42 @@ class MainFrame(wx.Frame):
         if not path.lower().endswith(".xlsx"):
             path = f"{path}.xlsx"
 
-        try:
-            import openpyxl
-        except Exception as exc:
-            wx.MessageBox(f"openpyxl 导入失败: {exc}", "导出", wx.OK | wx.ICON_WARNING)
-            return
+        rows = list(self.rows)
+        self.export_button.Disable()
+        # one extra step for workbook.save
+        self._export_progress = wx.ProgressDialog(
+            "导出",
+            "正在导出 Excel...",
+            maximum=len(rows) + 1,
+            parent=self,
+            style=wx.PD_AUTO_HIDE | wx.PD_SMOOTH,
+        )
+        self.ensure_executor()
+        future = self.executor.submit(
+            _write_xlsx,
+            path,
+            rows,
+            mac_only,
+            lambda done: wx.CallAfter(self._on_export_progress, done),
+        )
+        future.add_done_callback(
+            lambda fut: wx.CallAfter(self._on_export_done, fut, path)
+        )
 
-        workbook = openpyxl.Workbook()
-        sheet = workbook.active
-        sheet.title = "ESP32 MAC"
-        if mac_only:
-            for row in self.rows:
-                mac_value = row.get("mac", "")
-                if not mac_value:
-                    continue
-                sheet.append([mac_value])
-        else:
-            sheet.append(["时间", "串口", "MAC", "状态"])
-            for row in self.rows:
-                sheet.append([row["time"], row["port"], row["mac"], row["status"]])
+    def _on_export_progress(self, done: int) -> None:
+        if self._export_progress is not None:
+            self._export_progress.Update(done)
 
+    def _on_export_done(self, future, path: str) -> None:
+        if self._export_progress is not None:
+            self._export_progress.Destroy()
+            self._export_progress = None
+        self.export_button.Enable()
         try:
-            workbook.save(path)
+            future.result()
+        except ImportError as exc:
+            wx.MessageBox(f"openpyxl 导入失败: {exc}", "导出", wx.OK | wx.ICON_WARNING)
+            return
         except Exception as exc:
             wx.MessageBox(f"保存失败: {exc}", "导出", wx.OK | wx.ICON_ERROR)
             return
@@ -456,7 +823,6 @@ class MainFrame(wx.Frame):
     def on_export_mac_only_toggle(self, _event: wx.CommandEvent) -> None:
         self.export_mac_only = self.export_mac_only_toggle.GetValue()
         self.config["export_mac_only"] = self.export_mac_only
-        save_config(self.config)
         self.update_export_toggle_label()
 
     def restore_status_filter(self) -> None:
@@ -486,7 +852,6 @@ class MainFrame(wx.Frame):
         self.status_filter_value = value
         self.status_filter.SetLabel(self.status_filter_label())
         self.config["status_filter"] = self.status_filter_value
-        save_config(self.config)
         self.apply_filters()
 
     def update_export_toggle_label(self) -> None:
@@ -511,13 +876,40 @@ class MainFrame(wx.Frame):
                 thread_name_prefix="esp32-mac",
             )
 
+    def on_activate(self, event: wx.ActivateEvent) -> None:
+        if not event.GetActive():
+            self.queue_config_save()
+        event.Skip()
+
+    def queue_config_save(self) -> None:
+        if self._config_call is None:
+            self._config_call = wx.CallLater(500, self.flush_config)
+        else:
+            self._config_call.Start(500)
+
+    def flush_config(self) -> None:
+        if self._config_call is not None:
+            self._config_call.Stop()
+            self._config_call = None
+        text = format_config(self.config)
+        digest = hash(text)
+        if digest == self._last_config_hash:
+            return
+        write_config(text)
+        self._last_config_hash = digest
+
     def on_close(self, event: wx.CloseEvent) -> None:
-        save_config(self.config)
+        self.flush_config()
         self.Destroy()
 
     def Destroy(self) -> bool:  # noqa: N802
-        if self.timer.IsRunning():
-            self.timer.Stop()
+        self.stop_port_watcher()
+        if self._filter_timer.IsRunning():
+            self._filter_timer.Stop()
+        if self._status_call is not None:
+            self._status_call.Stop()
+        if self._config_call is not None:
+            self._config_call.Stop()
         if self.executor is not None:
             self.executor.shutdown(wait=False)
         return super().Destroy()
@@ -543,12 +935,40 @@ def load_version() -> str:
     return "0.0.0"
 
 
+def warm_up_imports() -> None:
+    def run() -> None:
+        global _esptool
+        for name in ("esptool", "openpyxl"):
+            try:
+                module = importlib.import_module(name)
+            except Exception:
+                continue
+            if name == "esptool" and _esptool is None:
+                _esptool = module
+
+    threading.Thread(target=run, name="esp32-mac-warmup", daemon=True).start()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ESP32 MAC monitor.")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="always read the MAC over serial, even for a board seen moments ago",
+    )
+    return parser.parse_args()
+
+
 def main() -> None:
+    global _mac_cache_enabled
+    args = parse_args()
+    _mac_cache_enabled = not args.no_cache
     version = load_version()
     ensure_gtk_resources()
     app = wx.App()
     frame = MainFrame(version)
     frame.Show()
+    warm_up_imports()
     app.MainLoop()
 
 